@@ -1,10 +1,12 @@
 # 01_comps/app.py
 from __future__ import annotations
 
+from io import BytesIO
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
 import streamlit as st
-from pathlib import Path
 
 
 # ======================================================
@@ -27,6 +29,9 @@ DEFAULT_RAW = APP_DIR / "data" / "raw" / "peers.csv"
 # Canonical columns expected by the app (after normalization)
 REQUIRED_COLS = ["company", "market_cap", "net_debt", "revenue", "ebitda", "net_income"]
 
+# Identifier columns stored as categoricals (filters compare integer codes)
+ID_COLS = ["company", "ticker", "currency"]
+
 # Column aliases accepted (robust to different naming conventions)
 COLUMN_ALIASES = {
     "market_cap": ["market_cap", "market_cap_m", "mkt_cap", "marketcap", "market_capitalization"],
@@ -36,6 +41,16 @@ COLUMN_ALIASES = {
     "net_income": ["net_income", "net_income_ltm", "net_income_ltm_m", "net_profit", "profit"],
 }
 
+# Inverted alias map (alias -> canonical) + alias priority (earlier variant wins)
+ALIAS_TO_CANON = {v: canon for canon, variants in COLUMN_ALIASES.items() for v in variants}
+ALIAS_RANK = {v: rank for variants in COLUMN_ALIASES.values() for rank, v in enumerate(variants)}
+
+# Trading multiples computed by the app, the target metric each applies to,
+# and whether it implies EV (bridged to Equity via net debt) or Equity directly
+MULTIPLE_COLS = ["EV / Revenue", "EV / EBITDA", "P / E"]
+MULTIPLE_BASES = ["revenue", "ebitda", "net_income"]
+MULTIPLE_IS_EV = np.array([True, True, False])
+
 
 # ======================================================
 # Helpers
@@ -45,71 +60,147 @@ def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
     Normalize / map columns to canonical names used by the app.
     Keeps extra columns (ticker, currency, etc.) untouched.
     """
-    df = df.copy()
-    df.columns = [c.strip().lower() for c in df.columns]
+    df = df.rename(columns=lambda c: c.strip().lower())
 
-    rename_map: dict[str, str] = {}
-    for canon, variants in COLUMN_ALIASES.items():
-        for v in variants:
-            if v in df.columns:
-                rename_map[v] = canon
-                break
+    # One dict lookup per column; per canonical name the highest-priority alias wins
+    chosen: dict[str, str] = {}
+    for c in sorted((c for c in df.columns if c in ALIAS_TO_CANON), key=ALIAS_RANK.__getitem__):
+        chosen.setdefault(ALIAS_TO_CANON[c], c)
+    rename_map = {c: canon for canon, c in chosen.items()}
 
-    df = df.rename(columns=rename_map)
-    return df
+    return df.rename(columns=rename_map)
 
 
 def to_numeric(df: pd.DataFrame, cols: list[str]) -> pd.DataFrame:
-    out = df.copy()
-    for c in cols:
-        out[c] = pd.to_numeric(out[c], errors="coerce")
-    return out
+    cols = [c for c in cols if not pd.api.types.is_numeric_dtype(df[c])]
+    if not cols:
+        return df
+    coerced = df[cols].apply(pd.to_numeric, errors="coerce")
+    return df.assign(**{c: coerced[c] for c in cols})
 
 
-def safe_div(n: pd.Series, d: pd.Series) -> pd.Series:
-    d = d.replace(0, np.nan)
-    x = n / d
-    return x.replace([np.inf, -np.inf], np.nan)
+def safe_div(n: np.ndarray, d: np.ndarray) -> np.ndarray:
+    """n / d, NaN where the denominator is zero (masked divide, no inf produced)."""
+    out = np.full_like(n, np.nan)
+    np.divide(n, d, out=out, where=d != 0)
+    return out
 
 
-def winsorize_series(s: pd.Series, p_low: float, p_high: float) -> pd.Series:
-    lo = s.quantile(p_low)
-    hi = s.quantile(p_high)
-    return s.clip(lower=lo, upper=hi)
+def implied_equity_vec(medians: np.ndarray, bases: np.ndarray, net_debt: float) -> np.ndarray:
+    """
+    Equity implied by each multiple in MULTIPLE_COLS order (one array expression).
+    - EV/Revenue and EV/EBITDA -> EV then minus net debt
+    - P/E -> Equity directly
+    """
+    implied = medians * bases
+    return np.where(MULTIPLE_IS_EV, implied - net_debt, implied)
 
 
-def stats(s: pd.Series) -> dict[str, float]:
-    s = s.dropna()
-    if s.empty:
-        return {"n": 0}
-    return {
-        "n": int(s.shape[0]),
-        "mean": float(s.mean()),
-        "median": float(s.median()),
-        "p25": float(s.quantile(0.25)),
-        "p75": float(s.quantile(0.75)),
-    }
+@st.cache_data(show_spinner=False)
+def load_peers(source: str | bytes, mtime: float | None = None) -> pd.DataFrame:
+    """
+    Read the peers CSV, normalize column names, coerce numerics and encode identifiers.
+    `source` is a file path (cache keyed with its mtime) or the uploaded file bytes.
+    """
+    def read(**kwargs) -> pd.DataFrame:
+        return pd.read_csv(BytesIO(source) if isinstance(source, bytes) else source, **kwargs)
+
+    # Arrow's columnar reader types numeric columns directly; fall back if unavailable
+    try:
+        df = read(engine="pyarrow")
+    except (ImportError, ValueError):
+        df = read()
+
+    df = normalize_columns(df)
+    num_cols = [c for c in REQUIRED_COLS if c != "company" and c in df.columns]
+    df = to_numeric(df, num_cols)
+    return df.astype({c: "category" for c in ID_COLS if c in df.columns})
+
+
+@st.cache_data(show_spinner=False)
+def compute_multiples_df(df: pd.DataFrame) -> pd.DataFrame:
+    """EV and trading multiples on the full dataset (target included)."""
+    mc, nd, rev, ebitda, ni = (
+        df[c].to_numpy(dtype=np.float64)
+        for c in ["market_cap", "net_debt", "revenue", "ebitda", "net_income"]
+    )
+    ev = mc + nd
+    return df.assign(
+        **{
+            "EV": ev,
+            "EV / Revenue": safe_div(ev, rev),
+            "EV / EBITDA": safe_div(ev, ebitda),
+            "P / E": safe_div(mc, ni),
+        }
+    )
 
 
-def implied_equity(
-    multiple_name: str,
-    multiple_value: float,
-    target_row: pd.Series,
-) -> float:
+def quantiles(a: np.ndarray, qs: tuple[float, ...] = (0.25, 0.5, 0.75)) -> np.ndarray:
     """
-    Equity implied from a given multiple (uses canonical columns).
-    - EV/Revenue and EV/EBITDA -> EV then minus net debt
-    - P/E -> Equity directly
+    Linear-interpolated quantiles (pandas default) of the non-NaN values.
+    Uses one np.partition selection pass instead of a full sort.
+    """
+    a = a[~np.isnan(a)]
+    if a.size == 0:
+        return np.full(len(qs), np.nan)
+    h = np.asarray(qs, dtype=np.float64) * (a.size - 1)
+    lo = np.floor(h).astype(np.intp)
+    hi = np.ceil(h).astype(np.intp)
+    part = np.partition(a, np.union1d(lo, hi))
+    return part[lo] + (h - lo) * (part[hi] - part[lo])
+
+
+@st.cache_data(show_spinner=False)
+def peer_stats(
+    peers: pd.DataFrame,
+    winsor: bool,
+    lo: float,
+    hi: float,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
     """
-    if multiple_name == "EV / Revenue":
-        ev = multiple_value * float(target_row["revenue"])
-        return ev - float(target_row["net_debt"])
-    if multiple_name == "EV / EBITDA":
-        ev = multiple_value * float(target_row["ebitda"])
-        return ev - float(target_row["net_debt"])
-    if multiple_name == "P / E":
-        return multiple_value * float(target_row["net_income"])
-    raise ValueError("Unsupported multiple")
+    Peer set (multiples optionally winsorized) and per-multiple stats
+    (n / Mean / Median / P25 / P75, one row per multiple), quantiles via quantiles().
+    """
+    mult = peers[MULTIPLE_COLS].to_numpy(dtype=np.float64)
+
+    if winsor:
+        bounds = np.column_stack([quantiles(col, (lo, hi)) for col in mult.T])
+        mult = np.clip(mult, bounds[0], bounds[1])
+        peers = peers.assign(**dict(zip(MULTIPLE_COLS, mult.T)))
+
+    rows = []
+    for col in mult.T:
+        col = col[~np.isnan(col)]
+        p25, p50, p75 = quantiles(col)
+        rows.append((col.size, col.mean() if col.size else np.nan, p50, p25, p75))
+
+    stats_df = pd.DataFrame(
+        rows,
+        index=MULTIPLE_COLS,
+        columns=["n", "Mean", "Median", "P25", "P75"],
+        dtype=np.float64,
+    )
+    return peers, stats_df
+
+
+@st.cache_data(show_spinner=False)
+def render_artifacts(peers: pd.DataFrame, cols: tuple[str, ...]) -> tuple[pd.DataFrame, bytes]:
+    """Rounded display frame + encoded CSV export of the peer set."""
+    return peers[list(cols)].round(2), peers.to_csv(index=False).encode("utf-8")
+
+
+@st.cache_data(show_spinner=False)
+def build_summary(medians: tuple[float, float, float], n_peers: int) -> bytes:
+    """Encoded TXT summary from already-computed peer medians (formatting only)."""
+    med_ev_rev, med_ev_ebitda, med_pe = medians
+    return (
+        "Comparable Companies — Trading Multiples Summary\n"
+        "==============================================\n\n"
+        f"Peers (ex target): {n_peers}\n\n"
+        f"EV/Revenue median: {med_ev_rev:.2f}x\n"
+        f"EV/EBITDA  median: {med_ev_ebitda:.2f}x\n"
+        f"P/E        median: {med_pe:.2f}x\n"
+    ).encode("utf-8")
 
 
 # ======================================================
@@ -138,14 +229,12 @@ with st.sidebar:
 # Load data
 # ======================================================
 if uploaded is not None:
-    df_raw = pd.read_csv(uploaded)
+    df_raw = load_peers(uploaded.getvalue())
 else:
     if not DEFAULT_RAW.exists():
         st.error(f"Default dataset not found: {DEFAULT_RAW}")
         st.stop()
-    df_raw = pd.read_csv(DEFAULT_RAW)
-
-df_raw = normalize_columns(df_raw)
+    df_raw = load_peers(str(DEFAULT_RAW), DEFAULT_RAW.stat().st_mtime)
 
 # Validate
 missing = [c for c in REQUIRED_COLS if c not in df_raw.columns]
@@ -158,26 +247,15 @@ if missing:
     )
     st.stop()
 
-# Coerce numeric
-df_raw = to_numeric(df_raw, [c for c in REQUIRED_COLS if c != "company"])
-
 # ======================================================
 # Compute multiples
 # ======================================================
-df = df_raw.copy()
-
-df["EV"] = df["market_cap"] + df["net_debt"]
-df["EV / Revenue"] = safe_div(df["EV"], df["revenue"])
-df["EV / EBITDA"] = safe_div(df["EV"], df["ebitda"])
-df["P / E"] = safe_div(df["market_cap"], df["net_income"])
-
-# Exclude target from peer set
-peers = df[df["company"] != target_name].copy()
+df = compute_multiples_df(df_raw)
 
-# Winsorize
-if winsorize:
-    for col in ["EV / Revenue", "EV / EBITDA", "P / E"]:
-        peers[col] = winsorize_series(peers[col], p_low, p_high)
+# Exclude target from peer set (+ winsorize) and summarize each multiple
+peer_mask = (df["company"] != target_name).to_numpy()
+peers, stats_df = peer_stats(df.loc[peer_mask], winsorize, p_low, p_high)
+medians = stats_df["Median"].to_numpy()
 
 # ======================================================
 # Layout
@@ -193,27 +271,20 @@ with col_left:
     if "currency" in df_raw.columns:
         display_cols.insert(2 if "ticker" in display_cols else 1, "currency")
 
-    st.dataframe(peers[display_cols].round(2), use_container_width=True)
+    peers_display, peers_csv = render_artifacts(peers, tuple(display_cols))
+    st.dataframe(peers_display, use_container_width=True)
 
     st.subheader("Downloads")
     st.download_button(
         label="Download peer multiples (CSV)",
-        data=peers.to_csv(index=False).encode("utf-8"),
+        data=peers_csv,
         file_name="comps_multiples.csv",
         mime="text/csv",
     )
 
-    summary_txt = (
-        "Comparable Companies — Trading Multiples Summary\n"
-        "==============================================\n\n"
-        f"Peers (ex target): {int(peers.shape[0])}\n\n"
-        f"EV/Revenue median: {stats(peers['EV / Revenue'])['median']:.2f}x\n"
-        f"EV/EBITDA  median: {stats(peers['EV / EBITDA'])['median']:.2f}x\n"
-        f"P/E        median: {stats(peers['P / E'])['median']:.2f}x\n"
-    )
     st.download_button(
         label="Download summary (TXT)",
-        data=summary_txt,
+        data=build_summary(tuple(medians.tolist()), int(peers.shape[0])),
         file_name="comps_summary.txt",
         mime="text/plain",
     )
@@ -221,42 +292,24 @@ with col_left:
 with col_right:
     st.subheader("Multiple Statistics (Peers)")
 
-    stats_df = pd.DataFrame(
-        {
-            "EV / Revenue": stats(peers["EV / Revenue"]),
-            "EV / EBITDA": stats(peers["EV / EBITDA"]),
-            "P / E": stats(peers["P / E"]),
-        }
-    ).T
-
-    stats_df = stats_df.rename(
-        columns={"n": "n", "mean": "Mean", "median": "Median", "p25": "P25", "p75": "P75"}
-    )[["n", "Mean", "Median", "P25", "P75"]]
-
     st.table(stats_df.round(2))
 
     # Target implied valuation
     st.subheader("Target — Implied Equity Value (Median)")
-    target_df = df[df["company"] == target_name].copy()
+    target_df = df.loc[~peer_mask]
 
     if target_df.empty:
         st.info("Target not found in dataset. Add it to the CSV or change the target name.")
     else:
         t = target_df.iloc[0]
 
-        med_ev_rev = float(stats(peers["EV / Revenue"])["median"])
-        med_ev_ebitda = float(stats(peers["EV / EBITDA"])["median"])
-        med_pe = float(stats(peers["P / E"])["median"])
+        bases = t[MULTIPLE_BASES].to_numpy(dtype=np.float64)
 
         implied_df = pd.DataFrame(
             {
-                "Method": ["EV / Revenue", "EV / EBITDA", "P / E"],
-                "Multiple (Median)": [med_ev_rev, med_ev_ebitda, med_pe],
-                "Implied Equity (m€)": [
-                    implied_equity("EV / Revenue", med_ev_rev, t),
-                    implied_equity("EV / EBITDA", med_ev_ebitda, t),
-                    implied_equity("P / E", med_pe, t),
-                ],
+                "Method": MULTIPLE_COLS,
+                "Multiple (Median)": medians,
+                "Implied Equity (m€)": implied_equity_vec(medians, bases, float(t["net_debt"])),
             }
         )
 
@@ -1,6 +1,7 @@
 # 01_comps/src/compute_multiples.py
 from __future__ import annotations
 
+from functools import lru_cache
 from pathlib import Path
 import numpy as np
 import pandas as pd
@@ -11,6 +12,8 @@ OUT_DIR = ROOT / "data" / "processed"
 OUT_PATH = OUT_DIR / "peers_with_multiples.csv"
 REPORT_PATH = ROOT / "reports" / "comps_summary.txt"
 
+TARGET_TICKER = "TGT"
+
 REQUIRED_COLS = [
     "company", "ticker", "currency",
     "market_cap_m", "net_debt_m",
@@ -22,28 +25,80 @@ NUM_COLS = [
     "revenue_ltm_m", "ebitda_ltm_m", "net_income_ltm_m",
 ]
 
+ID_COLS = ["company", "ticker", "currency"]
+
+# Below this many rows the pandas path wins: numba's import + JIT-cache load cost more than the kernel saves
+NUMBA_MIN_ROWS = 100_000
+
+# Read schema: identifiers as categoricals; financials keep pyarrow's inferred
+# numeric types so the processed CSV round-trips unchanged (kernel/safe_div cast to float64)
+CSV_DTYPES = {c: "category" for c in ID_COLS}
+
 
 def safe_div(numer: pd.Series, denom: pd.Series) -> pd.Series:
-    """Robust division: avoid div-by-zero and inf values."""
-    out = numer / denom.replace({0: np.nan})
-    return out.replace([np.inf, -np.inf], np.nan)
+    """Robust division: NaN where the denominator is zero (masked divide, no inf produced)."""
+    n = numer.to_numpy(dtype=np.float64)
+    d = denom.to_numpy(dtype=np.float64)
+    out = np.full_like(n, np.nan)
+    np.divide(n, d, out=out, where=d != 0)
+    return pd.Series(out, index=numer.index)
+
+
+def _multiples_loop(mc, nd, rev, ebitda, ni):
+    """EV + EV/Revenue, EV/EBITDA, P/E in one pass (NaN if denominator <= 0)."""
+    n = mc.shape[0]
+    ev = np.empty(n)
+    ev_rev = np.empty(n)
+    ev_ebitda = np.empty(n)
+    pe = np.empty(n)
+    for i in range(n):
+        e = mc[i] + nd[i]
+        ev[i] = e
+        ev_rev[i] = e / rev[i] if rev[i] > 0 else np.nan
+        ev_ebitda[i] = e / ebitda[i] if ebitda[i] > 0 else np.nan
+        pe[i] = mc[i] / ni[i] if ni[i] > 0 else np.nan
+    return ev, ev_rev, ev_ebitda, pe
+
+
+@lru_cache(maxsize=1)
+def _multiples_kernel():
+    """Compiled _multiples_loop, or None without numba (imported on first large frame only)."""
+    try:
+        from numba import njit
+    except ImportError:  # numba is optional: compute_multiples falls back to pandas
+        return None
+    return njit(cache=True)(_multiples_loop)
+
+
+def read_peers(path: Path) -> pd.DataFrame:
+    """Read the peers CSV with the typed pyarrow reader; fall back to the default engine."""
+    try:
+        return pd.read_csv(path, engine="pyarrow", dtype=CSV_DTYPES)
+    except (ImportError, ValueError):
+        return pd.read_csv(path)
 
 
 def validate_schema(df: pd.DataFrame) -> pd.DataFrame:
-    """Validate required columns and coerce numerics. Enforce single-currency dataset."""
+    """
+    Validate required columns, coerce numerics and encode identifiers as categoricals.
+    Enforce single-currency dataset.
+    """
     missing = [c for c in REQUIRED_COLS if c not in df.columns]
     if missing:
         raise ValueError(f"Missing required columns: {missing}")
 
-    df = df.copy()
-
-    for c in NUM_COLS:
-        df[c] = pd.to_numeric(df[c], errors="coerce")
+    # Already typed when read via read_peers(); only coerce what the fallback left as text
+    to_coerce = [c for c in NUM_COLS if not pd.api.types.is_numeric_dtype(df[c])]
+    if to_coerce:
+        coerced = df[to_coerce].apply(pd.to_numeric, errors="coerce")
+        df = df.assign(**{c: coerced[c] for c in to_coerce})
+    df = df.astype({c: "category" for c in ID_COLS})
 
-    if df["currency"].nunique() != 1:
+    # Identifiers are categoricals: distinct values / missing entries read off categories / codes
+    if df["currency"].cat.categories.size != 1:
         raise ValueError("Multiple currencies detected. Add FX normalization before proceeding.")
 
-    if df["ticker"].isna().any():
+    if (df["ticker"].cat.codes == -1).any():
         raise ValueError("Ticker column contains missing values.")
 
     return df
@@ -51,22 +106,39 @@ def validate_schema(df: pd.DataFrame) -> pd.DataFrame:
 
 def compute_multiples(df: pd.DataFrame) -> pd.DataFrame:
     """Compute EV and core valuation multiples (EV/Revenue, EV/EBITDA, P/E)."""
-    df = df.copy()
+    kernel = _multiples_kernel() if len(df) > NUMBA_MIN_ROWS else None
+    if kernel is not None:
+        ev, ev_rev, ev_ebitda, pe = kernel(*(df[c].to_numpy(dtype=np.float64) for c in NUM_COLS))
+        return df.assign(ev_m=ev, ev_rev=ev_rev, ev_ebitda=ev_ebitda, pe=pe)
 
     # Enterprise Value
-    df["ev_m"] = df["market_cap_m"] + df["net_debt_m"]
+    ev = df["market_cap_m"] + df["net_debt_m"]
 
     # Multiples (set NaN if denominator <= 0: standard practice)
-    df["ev_rev"] = safe_div(df["ev_m"], df["revenue_ltm_m"].where(df["revenue_ltm_m"] > 0))
-    df["ev_ebitda"] = safe_div(df["ev_m"], df["ebitda_ltm_m"].where(df["ebitda_ltm_m"] > 0))
-    df["pe"] = safe_div(df["market_cap_m"], df["net_income_ltm_m"].where(df["net_income_ltm_m"] > 0))
+    return df.assign(
+        ev_m=ev,
+        ev_rev=safe_div(ev, df["revenue_ltm_m"].where(df["revenue_ltm_m"] > 0)),
+        ev_ebitda=safe_div(ev, df["ebitda_ltm_m"].where(df["ebitda_ltm_m"] > 0)),
+        pe=safe_div(df["market_cap_m"], df["net_income_ltm_m"].where(df["net_income_ltm_m"] > 0)),
+    )
 
-    return df
 
+def split_peers(df: pd.DataFrame, target_ticker: str = TARGET_TICKER) -> tuple[pd.DataFrame, pd.Series]:
+    """Split dataset into peer set and target row with a single ticker mask."""
+    peer_mask = (df["ticker"] != target_ticker).to_numpy()
+    target = df.loc[~peer_mask]
+    if target.empty:
+        raise ValueError(f"Target ticker '{target_ticker}' not found in dataset.")
+    return df.loc[peer_mask], target.iloc[0]
+
+
+def target_floats(target: pd.Series) -> dict[str, float]:
+    """Target financials as plain floats, so valuation arithmetic does no Series lookups."""
+    return dict(zip(NUM_COLS, target[NUM_COLS].to_numpy(dtype=np.float64).tolist()))
 
-def peer_summary(df: pd.DataFrame, target_ticker: str = "TGT") -> dict:
-    """Compute mean/median multiples on the peer set (excluding target)."""
-    peers = df[df["ticker"] != target_ticker].copy()
+
+def peer_summary(peers: pd.DataFrame) -> dict:
+    """Compute mean/median multiples on the peer set (target already excluded)."""
     return {
         "EV/Revenue (median)": peers["ev_rev"].median(),
         "EV/EBITDA (median)": peers["ev_ebitda"].median(),
@@ -79,64 +151,59 @@ def peer_summary(df: pd.DataFrame, target_ticker: str = "TGT") -> dict:
 
 
 def implied_valuation(
-    df: pd.DataFrame,
-    target_ticker: str = "TGT",
+    peers: pd.DataFrame,
+    target: pd.Series,
     multiple_col: str = "ev_ebitda",
 ) -> dict:
     """
     Implied valuation for target using peer median multiple.
     Default: EV/EBITDA median -> EV implied -> Equity implied (EV - Net Debt).
     """
-    peers = df[df["ticker"] != target_ticker]
-    target = df[df["ticker"] == target_ticker]
+    t = target_floats(target)
+    mult = peers[multiple_col].to_numpy(dtype=np.float64)
+    mult = mult[~np.isnan(mult)]
 
-    if target.empty:
-        raise ValueError(f"Target ticker '{target_ticker}' not found in dataset.")
-    target = target.iloc[0]
-
-    multiple = peers[multiple_col].median()
-    if pd.isna(multiple):
+    if mult.size == 0:
         raise ValueError(f"Cannot compute implied valuation: median of '{multiple_col}' is NaN.")
+    multiple = float(np.median(mult))
 
     if multiple_col == "ev_ebitda":
-        base = target["ebitda_ltm_m"]
+        base = t["ebitda_ltm_m"]
         base_name = "EBITDA LTM"
     elif multiple_col == "ev_rev":
-        base = target["revenue_ltm_m"]
+        base = t["revenue_ltm_m"]
         base_name = "Revenue LTM"
     else:
         raise ValueError("multiple_col must be one of: 'ev_ebitda', 'ev_rev'.")
 
-    if pd.isna(base) or base <= 0:
+    if np.isnan(base) or base <= 0:
         raise ValueError(f"Target {base_name} is invalid (<=0 or missing), cannot apply {multiple_col}.")
 
     ev_implied = multiple * base
-    equity_implied = ev_implied - target["net_debt_m"]
-    upside_pct = equity_implied / target["market_cap_m"] - 1 if target["market_cap_m"] > 0 else np.nan
+    equity_implied = ev_implied - t["net_debt_m"]
+    upside_pct = equity_implied / t["market_cap_m"] - 1 if t["market_cap_m"] > 0 else np.nan
 
     return {
         "multiple_metric": multiple_col,
-        "multiple_used": float(multiple),
+        "multiple_used": multiple,
         "base_metric": base_name,
-        "base_value_m": float(base),
-        "ev_implied_m": float(ev_implied),
-        "equity_implied_m": float(equity_implied),
-        "current_market_cap_m": float(target["market_cap_m"]),
-        "upside_pct": float(upside_pct) if not pd.isna(upside_pct) else np.nan,
+        "base_value_m": base,
+        "ev_implied_m": ev_implied,
+        "equity_implied_m": equity_implied,
+        "current_market_cap_m": t["market_cap_m"],
+        "upside_pct": upside_pct,
     }
 
 
-def winsorize_series(s: pd.Series, lower_q: float = 0.05, upper_q: float = 0.95) -> pd.Series:
-    """Clip a series to quantile bounds (winsorization)."""
-    s = s.astype(float)
-    lo = s.quantile(lower_q)
-    hi = s.quantile(upper_q)
-    return s.clip(lower=lo, upper=hi)
+def winsorize_array(arr: np.ndarray, lower_q: float = 0.05, upper_q: float = 0.95) -> np.ndarray:
+    """Clip a float array to its (NaN-ignoring) quantile bounds (winsorization)."""
+    lo, hi = np.nanquantile(arr, [lower_q, upper_q])
+    return np.clip(arr, lo, hi)
 
 
 def valuation_range(
-    df: pd.DataFrame,
-    target_ticker: str = "TGT",
+    peers: pd.DataFrame,
+    target: pd.Series,
     multiple_col: str = "ev_ebitda",
     winsorize: bool = True,
     lower_q: float = 0.05,
@@ -146,113 +213,110 @@ def valuation_range(
     Compute implied EV/Equity range for target using peer multiple distribution (P25/P50/P75).
     Optionally winsorize peer multiples before computing quantiles.
     """
-    peers = df[df["ticker"] != target_ticker].copy()
-    target = df[df["ticker"] == target_ticker]
-    if target.empty:
-        raise ValueError(f"Target ticker '{target_ticker}' not found.")
-    target = target.iloc[0]
+    t = target_floats(target)
 
     if multiple_col == "ev_ebitda":
-        base = target["ebitda_ltm_m"]
+        base = t["ebitda_ltm_m"]
         base_name = "EBITDA LTM"
     elif multiple_col == "ev_rev":
-        base = target["revenue_ltm_m"]
+        base = t["revenue_ltm_m"]
         base_name = "Revenue LTM"
     else:
         raise ValueError("multiple_col must be one of: 'ev_ebitda', 'ev_rev'.")
 
-    if pd.isna(base) or base <= 0:
+    if np.isnan(base) or base <= 0:
         raise ValueError(f"Target {base_name} invalid (<=0 or missing).")
 
-    mult = peers[multiple_col].dropna()
-    if mult.empty:
+    mult = peers[multiple_col].to_numpy(dtype=np.float64)
+    mult = mult[~np.isnan(mult)]
+    if mult.size == 0:
         raise ValueError(f"No valid peer multiples for '{multiple_col}'.")
 
     if winsorize:
-        mult = winsorize_series(mult, lower_q=lower_q, upper_q=upper_q)
+        mult = winsorize_array(mult, lower_q=lower_q, upper_q=upper_q)
 
-    q25, q50, q75 = mult.quantile([0.25, 0.50, 0.75]).tolist()
+    q25, q50, q75 = np.quantile(mult, [0.25, 0.50, 0.75]).tolist()
+    net_debt = t["net_debt_m"]
+    mcap = t["market_cap_m"]
 
     def to_equity(m: float) -> tuple[float, float]:
         ev = m * base
-        eq = ev - target["net_debt_m"]
-        return float(ev), float(eq)
+        return ev, ev - net_debt
 
     ev25, eq25 = to_equity(q25)
     ev50, eq50 = to_equity(q50)
     ev75, eq75 = to_equity(q75)
 
     def upside(eq: float) -> float:
-        return eq / target["market_cap_m"] - 1 if target["market_cap_m"] > 0 else np.nan
+        return eq / mcap - 1 if mcap > 0 else np.nan
 
     return {
         "multiple_metric": multiple_col,
         "base_metric": base_name,
-        "base_value_m": float(base),
+        "base_value_m": base,
         "winsorized": winsorize,
         "winsor_q": (lower_q, upper_q) if winsorize else None,
-        "multiples": {"p25": float(q25), "p50": float(q50), "p75": float(q75)},
+        "multiples": {"p25": q25, "p50": q50, "p75": q75},
         "implied_ev_m": {"p25": ev25, "p50": ev50, "p75": ev75},
         "implied_equity_m": {"p25": eq25, "p50": eq50, "p75": eq75},
-        "upside_pct": {"p25": float(upside(eq25)), "p50": float(upside(eq50)), "p75": float(upside(eq75))},
-        "current_market_cap_m": float(target["market_cap_m"]),
+        "upside_pct": {"p25": upside(eq25), "p50": upside(eq50), "p75": upside(eq75)},
+        "current_market_cap_m": mcap,
     }
 
 
 def write_report(summary: dict, valuation: dict, valuation_range_dict: dict, out_path: Path) -> None:
     out_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write("COMPARABLE COMPANIES ANALYSIS – SUMMARY\n")
-        f.write("=" * 45 + "\n\n")
-
-        f.write("1. Peer Set Overview\n")
-        f.write(f"Number of peers (ex Target): {summary['n_peers']}\n\n")
-
-        f.write("2. Trading Multiples (Peers)\n")
-        f.write(f"EV / Revenue (median): {summary['EV/Revenue (median)']:.2f}x\n")
-        f.write(f"EV / EBITDA  (median): {summary['EV/EBITDA (median)']:.2f}x\n")
-        f.write(f"P/E          (median): {summary['P/E (median)']:.2f}x\n\n")
-
-        f.write("3. Implied Valuation – Base Case (EV / EBITDA median)\n")
-        f.write(f"Implied Enterprise Value : {valuation['ev_implied_m']:,.0f} m€\n")
-        f.write(f"Implied Equity Value     : {valuation['equity_implied_m']:,.0f} m€\n")
-        f.write(f"Current Market Cap       : {valuation['current_market_cap_m']:,.0f} m€\n")
-        f.write(f"Upside / (Downside)      : {valuation['upside_pct']:.1%}\n\n")
-
-        f.write("4. Valuation Range (Winsorized P25 / P50 / P75)\n")
-        f.write(
-            f"Equity Value Range (m€): "
-            f"{valuation_range_dict['implied_equity_m']['p25']:,.0f} / "
-            f"{valuation_range_dict['implied_equity_m']['p50']:,.0f} / "
-            f"{valuation_range_dict['implied_equity_m']['p75']:,.0f}\n"
-        )
-        f.write(
-            f"Upside Range (%): "
-            f"{valuation_range_dict['upside_pct']['p25']:.1%} / "
-            f"{valuation_range_dict['upside_pct']['p50']:.1%} / "
-            f"{valuation_range_dict['upside_pct']['p75']:.1%}\n\n"
-        )
-
-        f.write("5. Conclusion\n")
-        f.write(
-            "Based on peer median EV/EBITDA multiples, the target company appears "
-            "moderately undervalued relative to the market, with a positive upside "
-            "in the base and upper quartile scenarios.\n"
-        )
+    eq = valuation_range_dict["implied_equity_m"]
+    up = valuation_range_dict["upside_pct"]
+
+    lines = [
+        "COMPARABLE COMPANIES ANALYSIS – SUMMARY",
+        "=" * 45,
+        "",
+        "1. Peer Set Overview",
+        f"Number of peers (ex Target): {summary['n_peers']}",
+        "",
+        "2. Trading Multiples (Peers)",
+        f"EV / Revenue (median): {summary['EV/Revenue (median)']:.2f}x",
+        f"EV / EBITDA  (median): {summary['EV/EBITDA (median)']:.2f}x",
+        f"P/E          (median): {summary['P/E (median)']:.2f}x",
+        "",
+        "3. Implied Valuation – Base Case (EV / EBITDA median)",
+        f"Implied Enterprise Value : {valuation['ev_implied_m']:,.0f} m€",
+        f"Implied Equity Value     : {valuation['equity_implied_m']:,.0f} m€",
+        f"Current Market Cap       : {valuation['current_market_cap_m']:,.0f} m€",
+        f"Upside / (Downside)      : {valuation['upside_pct']:.1%}",
+        "",
+        "4. Valuation Range (Winsorized P25 / P50 / P75)",
+        f"Equity Value Range (m€): {eq['p25']:,.0f} / {eq['p50']:,.0f} / {eq['p75']:,.0f}",
+        f"Upside Range (%): {up['p25']:.1%} / {up['p50']:.1%} / {up['p75']:.1%}",
+        "",
+        "5. Conclusion",
+        "Based on peer median EV/EBITDA multiples, the target company appears "
+        "moderately undervalued relative to the market, with a positive upside "
+        "in the base and upper quartile scenarios.",
+        "",
+    ]
+
+    # Single formatting pass + single write
+    out_path.write_text("\n".join(lines), encoding="utf-8")
 
 
 def main() -> None:
     OUT_DIR.mkdir(parents=True, exist_ok=True)
 
-    df = pd.read_csv(RAW_PATH)
+    df = read_peers(RAW_PATH)
     df = validate_schema(df)
 
     out = compute_multiples(df)
     out.to_csv(OUT_PATH, index=False)
 
+    # Peer set / target split (single mask, reused below)
+    peers, target = split_peers(out, target_ticker=TARGET_TICKER)
+
     # Peer stats (exclude target)
-    summary = peer_summary(out, target_ticker="TGT")
+    summary = peer_summary(peers)
 
     print("=== Peer Multiples Summary (ex TargetCo) ===")
     for k, v in summary.items():
@@ -262,7 +326,7 @@ def main() -> None:
             print(f"{k:22s}: {v}")
 
     # Single-point implied valuation using EV/EBITDA median
-    valuation = implied_valuation(out, target_ticker="TGT", multiple_col="ev_ebitda")
+    valuation = implied_valuation(peers, target, multiple_col="ev_ebitda")
 
     print("\n=== Implied Valuation – TargetCo (Peer median) ===")
     print(f"Multiple metric     : {valuation['multiple_metric']}")
@@ -276,8 +340,8 @@ def main() -> None:
 
     # Range implied valuation (P25/P50/P75) with winsorization
     vr = valuation_range(
-        out,
-        target_ticker="TGT",
+        peers,
+        target,
         multiple_col="ev_ebitda",
         winsorize=True,
         lower_q=0.05,
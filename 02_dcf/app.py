@@ -2,7 +2,6 @@ import sys
 from pathlib import Path
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
 import numpy as np
 
 # -------------------------
@@ -13,56 +12,65 @@ SRC_DIR = APP_DIR / "src"                          # .../02_dcf/src
 sys.path.append(str(SRC_DIR))
 sys.path.append(str(APP_DIR))
 
-from data import assumptions as a
+from data.assumptions import Assumptions, ASSUMPTIONS as a
 from src.wacc import compute_wacc
+from src.dcf_valuation import pv_of, terminal_value
+from src.fcf_build import arrays_to_df, build_fcf_arrays
 
+METRICS = ("PV explicit FCFs", "PV terminal value", "Enterprise Value", "Net Debt", "Equity Value")
+WATERFALL_STEPS = ["Enterprise Value", "Net Debt", "Equity Value"]
 
-def build_fcf_table(
-    n_years: int,
-    revenue_0: float,
-    revenue_growth: float,
-    ebit_margin: float,
-    tax_rate: float,
-    da_pct_rev: float,
-    capex_pct_rev: float,
-    nwc_pct_rev: float,
-) -> pd.DataFrame:
-    years = list(range(1, n_years + 1))
-    revenue = [revenue_0 * (1 + revenue_growth) ** t for t in years]
 
-    ebit = [r * ebit_margin for r in revenue]
-    nopat = [e * (1 - tax_rate) for e in ebit]
-    da = [r * da_pct_rev for r in revenue]
-    capex = [r * capex_pct_rev for r in revenue]
+@st.cache_data(show_spinner=False)
+def fcf_arrays(scenario: Assumptions) -> dict[str, np.ndarray]:
+    """FCF build-up from src/fcf_build.py for the sidebar scenario, cached per scenario."""
+    return build_fcf_arrays(scenario)
 
-    nwc = [r * nwc_pct_rev for r in revenue]
-    delta_nwc = [nwc[0] - revenue_0 * nwc_pct_rev] + [nwc[i] - nwc[i - 1] for i in range(1, n_years)]
 
-    fcf = [nopat[i] + da[i] - capex[i] - delta_nwc[i] for i in range(n_years)]
+def sensitivity_grid(
+    fcfs,
+    wacc_grid: np.ndarray,
+    g_grid: np.ndarray,
+    net_debt: float,
+) -> np.ndarray:
+    """
+    Equity value for every (g, WACC) pair in one broadcast: rows = g, columns = WACC.
+    Cells with WACC <= g are NaN.
+    """
+    fcfs = np.asarray(fcfs, dtype=np.float64)
+    n = fcfs.size
+    W = wacc_grid[None, :]
+    G = g_grid[:, None]
+
+    # (n_wacc, n) discount factors, built once as a running product along t (no pow)
+    DF = np.cumprod(np.repeat((1.0 / (1.0 + wacc_grid))[:, None], n, axis=1), axis=1)
+    pv_fcfs = (DF @ fcfs)[None, :]                    # single matvec -> (1, n_wacc)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tv = fcfs[-1] * (1.0 + G) / (W - G)           # (n_g, n_wacc)
+    pv_tv = tv * DF[:, -1][None, :]                   # reuse 1 / (1 + WACC) ** n
+
+    return np.where(W <= G, np.nan, pv_fcfs + pv_tv - net_debt)
+
+
+@st.cache_data(show_spinner=False)
+def compute_sensitivity(
+    fcfs: np.ndarray,
+    wacc: float,
+    terminal_g: float,
+    net_debt: float,
+) -> pd.DataFrame:
+    """Equity value table around (WACC, g): rows = g ± 0.5pt, columns = WACC ± 1pt."""
+    wacc_grid = np.array([wacc - 0.01, wacc - 0.005, wacc, wacc + 0.005, wacc + 0.01])
+    g_grid = np.array([terminal_g - 0.005, terminal_g, terminal_g + 0.005])
 
     return pd.DataFrame(
-        {
-            "Year": years,
-            "Revenue": revenue,
-            "EBIT": ebit,
-            "NOPAT": nopat,
-            "D&A": da,
-            "CAPEX": capex,
-            "ΔNWC": delta_nwc,
-            "FCF": fcf,
-        }
+        index=[f"{gg:.2%}" for gg in g_grid],
+        columns=[f"{ww:.2%}" for ww in wacc_grid],
+        data=sensitivity_grid(fcfs, wacc_grid, g_grid, net_debt),
     )
 
 
-def discount(values: list[float], rate: float) -> list[float]:
-    return [v / (1 + rate) ** t for t, v in enumerate(values, start=1)]
-
-
-def terminal_value(fcf_last: float, wacc: float, g: float) -> float:
-    if wacc <= g:
-        raise ValueError("WACC must be strictly greater than terminal growth rate.")
-    return fcf_last * (1 + g) / (wacc - g)
-
 def build_dcf_report_text(
     fcf_df: pd.DataFrame,
     wacc: float,
@@ -73,40 +81,60 @@ def build_dcf_report_text(
     ev: float,
     eq: float,
 ) -> str:
-    lines = []
-    lines.append("DISCOUNTED CASH FLOW – SUMMARY")
-    lines.append("=" * 40)
-    lines.append("")
-    lines.append("1. Key Assumptions")
-    lines.append(f"Forecast years: {int(fcf_df.shape[0])}")
-    lines.append(f"Revenue Year 1: {fcf_df.loc[0, 'Revenue']:,.0f} m€")
-    lines.append(f"WACC: {wacc:.2%}")
-    lines.append(f"Terminal growth: {terminal_g:.2%}")
-    lines.append(f"Net debt: {net_debt:,.0f} m€")
-    lines.append("")
-    lines.append("2. Valuation Overview")
-    lines.append(f"PV of explicit FCFs: {pv_fcfs:,.0f} m€")
-    lines.append(f"PV of terminal value: {pv_tv:,.0f} m€")
-    lines.append(f"Enterprise Value: {ev:,.0f} m€")
-    lines.append(f"Equity Value: {eq:,.0f} m€")
-    lines.append("")
-    lines.append("3. FCF Snapshot (m€)")
-    # Keep it short: year + FCF
-    for _, r in fcf_df[["Year", "FCF"]].iterrows():
-        lines.append(f"Year {int(r['Year'])}: {float(r['FCF']):,.0f}")
-    lines.append("")
-    lines.append("4. Notes")
-    lines.append("Terminal value is computed using Gordon Growth and discounted at WACC.")
-    lines.append("This output is for educational/demonstration purposes only.")
-    return "\n".join(lines)
-
-from io import BytesIO
-
+    # Keep it short: year + FCF (zip over the raw arrays, no per-row Series)
+    years = fcf_df["Year"].to_numpy()
+    fcfs = fcf_df["FCF"].to_numpy(dtype=np.float64)
+    fcf_block = "\n".join(map("Year {}: {:,.0f}".format, years.tolist(), fcfs.tolist()))
+
+    return f"""DISCOUNTED CASH FLOW – SUMMARY
+{"=" * 40}
+
+1. Key Assumptions
+Forecast years: {int(fcf_df.shape[0])}
+Revenue Year 1: {fcf_df.loc[0, 'Revenue']:,.0f} m€
+WACC: {wacc:.2%}
+Terminal growth: {terminal_g:.2%}
+Net debt: {net_debt:,.0f} m€
+
+2. Valuation Overview
+PV of explicit FCFs: {pv_fcfs:,.0f} m€
+PV of terminal value: {pv_tv:,.0f} m€
+Enterprise Value: {ev:,.0f} m€
+Equity Value: {eq:,.0f} m€
+
+3. FCF Snapshot (m€)
+{fcf_block}
+
+4. Notes
+Terminal value is computed using Gordon Growth and discounted at WACC.
+This output is for educational/demonstration purposes only."""
+
+def column_widths(df: pd.DataFrame, decimals: int = 2, index: bool = False) -> np.ndarray:
+    """Max rendered text length per Excel column (header included), floats as shown with `decimals`."""
+    fmt = f"{{:,.{decimals}f}}".format
+    text = (s.map(fmt, na_action="ignore").fillna("") if s.dtype.kind == "f" else s.astype(str) for _, s in df.items())
+    cell_len = np.array([t.str.len().max() for t in text], dtype=np.int64)
+    header_len = np.array([len(str(c)) for c in df.columns], dtype=np.int64)
+    widths = np.maximum(cell_len, header_len)
+    if index:
+        widths = np.concatenate([[df.index.astype(str).str.len().max()], widths])
+    return widths
+
+
+@st.cache_data(show_spinner=False)
 def build_dcf_excel_bytes(
     fcf_df: pd.DataFrame,
     valuation_df: pd.DataFrame,
     sensi_df: pd.DataFrame | None = None,
 ) -> bytes:
+    """
+    Workbook with the full-precision frames; rounding is left to each float
+    cell's number_format, so no rounded copies are built for the export.
+    """
+    # Excel machinery is only imported when an export is actually built
+    from io import BytesIO
+    from openpyxl.utils import get_column_letter
+
     output = BytesIO()
 
     with pd.ExcelWriter(output, engine="openpyxl") as writer:
@@ -118,17 +146,25 @@ def build_dcf_excel_bytes(
 
         wb = writer.book
 
-        def format_sheet(name):
+        def format_sheet(name, df, decimals, index=False):
             ws = wb[name]
             ws.freeze_panes = "A2"
-            for col in ws.columns:
-                max_len = max(len(str(c.value)) if c.value else 0 for c in col)
-                ws.column_dimensions[col[0].column_letter].width = min(max(10, max_len + 2), 30)
-
-        format_sheet("FCF")
-        format_sheet("Valuation")
+            for i, w in enumerate(column_widths(df, decimals, index=index)):
+                ws.column_dimensions[get_column_letter(i + 1)].width = min(max(10, int(w) + 2), 30)
+
+            number_format = "#,##0." + "0" * decimals if decimals else "#,##0"
+            first_col = 2 if index else 1
+            for j, (_, s) in enumerate(df.items()):
+                if s.dtype.kind != "f":
+                    continue
+                c = first_col + j
+                for (cell,) in ws.iter_rows(min_row=2, min_col=c, max_col=c):
+                    cell.number_format = number_format
+
+        format_sheet("FCF", fcf_df, 2)
+        format_sheet("Valuation", valuation_df, 2)
         if sensi_df is not None:
-            format_sheet("Sensitivity")
+            format_sheet("Sensitivity", sensi_df, 0, index=True)
 
     output.seek(0)
     return output.getvalue()
@@ -139,22 +175,22 @@ st.title("Discounted Cash Flow (DCF) — Interactive Model")
 with st.sidebar:
     st.header("Operating Assumptions")
 
-    n_years = st.number_input("Forecast years", min_value=3, max_value=10, value=int(getattr(a, "N_YEARS", 5)))
+    n_years = st.number_input("Forecast years", min_value=3, max_value=10, value=a.n_years)
 
-    revenue_0 = st.number_input("Revenue (Year 0), m€", min_value=0.0, value=float(getattr(a, "REVENUE_0", 5000.0)))
-    revenue_growth = st.number_input("Revenue growth (p.a.)", min_value=-0.50, max_value=0.50, value=float(getattr(a, "REVENUE_GROWTH", 0.04)), format="%.4f")
+    revenue_0 = st.number_input("Revenue (Year 0), m€", min_value=0.0, value=a.revenue_0)
+    revenue_growth = st.number_input("Revenue growth (p.a.)", min_value=-0.50, max_value=0.50, value=a.revenue_growth, format="%.4f")
 
-    ebit_margin = st.number_input("EBIT margin", min_value=-0.50, max_value=0.80, value=float(getattr(a, "EBIT_MARGIN", 0.20)), format="%.4f")
-    tax_rate = st.number_input("Tax rate", min_value=0.0, max_value=0.60, value=float(getattr(a, "TAX_RATE", 0.28)), format="%.4f")
+    ebit_margin = st.number_input("EBIT margin", min_value=-0.50, max_value=0.80, value=a.ebit_margin, format="%.4f")
+    tax_rate = st.number_input("Tax rate", min_value=0.0, max_value=0.60, value=a.tax_rate, format="%.4f")
 
-    da_pct = st.number_input("D&A (% revenue)", min_value=0.0, max_value=0.30, value=float(getattr(a, "DA_PCT_REVENUE", 0.03)), format="%.4f")
-    capex_pct = st.number_input("CAPEX (% revenue)", min_value=0.0, max_value=0.50, value=float(getattr(a, "CAPEX_PCT_REVENUE", 0.04)), format="%.4f")
-    nwc_pct = st.number_input("NWC (% revenue)", min_value=0.0, max_value=0.50, value=float(getattr(a, "NWC_PCT_REVENUE", 0.10)), format="%.4f")
+    da_pct = st.number_input("D&A (% revenue)", min_value=0.0, max_value=0.30, value=a.da_pct_revenue, format="%.4f")
+    capex_pct = st.number_input("CAPEX (% revenue)", min_value=0.0, max_value=0.50, value=a.capex_pct_revenue, format="%.4f")
+    nwc_pct = st.number_input("NWC (% revenue)", min_value=0.0, max_value=0.50, value=a.nwc_pct_revenue, format="%.4f")
 
     st.divider()
     st.header("Valuation Assumptions")
-    terminal_g = st.number_input("Terminal growth (g)", min_value=-0.05, max_value=0.10, value=float(getattr(a, "TERMINAL_GROWTH", 0.025)), format="%.4f")
-    net_debt = st.number_input("Net debt, m€", min_value=-1e9, max_value=1e9, value=float(getattr(a, "NET_DEBT", 600.0)))
+    terminal_g = st.number_input("Terminal growth (g)", min_value=-0.05, max_value=0.10, value=a.terminal_growth, format="%.4f")
+    net_debt = st.number_input("Net debt, m€", min_value=-1e9, max_value=1e9, value=a.net_debt)
 
     st.divider()
     st.header("Discount Rate")
@@ -162,61 +198,48 @@ with st.sidebar:
     manual_wacc = st.number_input("Manual WACC (if unchecked)", min_value=0.0, max_value=0.30, value=0.08, format="%.4f")
 
 # Compute
-fcf_df = build_fcf_table(
-    n_years=n_years,
+scenario = a._replace(
+    n_years=int(n_years),
     revenue_0=revenue_0,
     revenue_growth=revenue_growth,
     ebit_margin=ebit_margin,
     tax_rate=tax_rate,
-    da_pct_rev=da_pct,
-    capex_pct_rev=capex_pct,
-    nwc_pct_rev=nwc_pct,
+    da_pct_revenue=da_pct,
+    capex_pct_revenue=capex_pct,
+    nwc_pct_revenue=nwc_pct,
 )
+fcf = fcf_arrays(scenario)
+fcfs = fcf["FCF"]
+fcf_df = arrays_to_df(fcf)
 
-wacc = float(compute_wacc()) if use_model_wacc else float(manual_wacc)
+wacc = compute_wacc() if use_model_wacc else float(manual_wacc)
 
 col1, col2 = st.columns([1.5, 1.0])
 
 with col1:
     st.subheader("FCF Forecast (Build-up)")
-    st.dataframe(fcf_df.round(2), width="stretch")
+    st.dataframe(fcf_df.style.format("{:,.2f}", subset=fcf_df.columns[1:]), width="stretch")
 
     st.subheader("Charts")
-    fig, ax = plt.subplots()
-    ax.plot(fcf_df["Year"], fcf_df["FCF"], marker="o")
-    ax.set_xlabel("Year")
-    ax.set_ylabel("FCF (m€)")
-    ax.set_title("Free Cash Flow Forecast")
-    st.pyplot(fig)
-
-    fig2, ax2 = plt.subplots()
-    ax2.plot(fcf_df["Year"], fcf_df["Revenue"], marker="o")
-    ax2.set_xlabel("Year")
-    ax2.set_ylabel("Revenue (m€)")
-    ax2.set_title("Revenue Forecast")
-    st.pyplot(fig2)
+    st.line_chart(fcf_df, x="Year", y="FCF", x_label="Year", y_label="FCF (m€)")
+    st.line_chart(fcf_df, x="Year", y="Revenue", x_label="Year", y_label="Revenue (m€)")
 
 with col2:
     st.subheader("DCF Output")
     sensi = None
     try:
-        fcfs = fcf_df["FCF"].astype(float).tolist()
-        pv_fcfs = float(sum(discount(fcfs, wacc)))
+        pv_fcfs, last_df = pv_of(fcfs, wacc)
 
-        tv = float(terminal_value(fcfs[-1], wacc, terminal_g))
-        pv_tv = float(tv / (1 + wacc) ** len(fcfs))
+        # terminal_value() also enforces the WACC > g guardrail
+        pv_tv = terminal_value(fcfs[-1], wacc, terminal_g) * last_df
 
         ev = pv_fcfs + pv_tv
         eq = ev - float(net_debt)
 
-        out = pd.DataFrame(
-            {
-                "Metric": ["PV explicit FCFs", "PV terminal value", "Enterprise Value", "Net Debt", "Equity Value"],
-                "Value (m€)": [pv_fcfs, pv_tv, ev, float(net_debt), eq],
-            }
-        )
+        values = np.array([pv_fcfs, pv_tv, ev, net_debt, eq], dtype=np.float64)
+        out = pd.DataFrame({"Metric": METRICS, "Value (m€)": values})
 
-        st.table(out.round(2))
+        st.table(out.style.format({"Value (m€)": "{:,.2f}"}))
         st.write(f"WACC used: {wacc:.2%}")
         st.write(f"Terminal growth: {terminal_g:.2%}")
 
@@ -241,9 +264,9 @@ with col2:
 
         # Excel download (FCF + Valuation, Sensitivity optional)
         excel_bytes = build_dcf_excel_bytes(
-            fcf_df=fcf_df.round(2),
-            valuation_df=out.round(2),
-            sensi_df=None if sensi is None else sensi.round(0),
+            fcf_df=fcf_df,
+            valuation_df=out,
+            sensi_df=sensi,
         )
 
         st.download_button(
@@ -256,44 +279,22 @@ with col2:
         st.subheader("EV to Equity Waterfall")
         wf = pd.DataFrame(
             {
-                "Step": ["Enterprise Value", "Net Debt", "Equity Value"],
+                # ordered categorical keeps the bridge order (EV -> Net Debt -> Equity) on the x-axis
+                "Step": pd.Categorical(WATERFALL_STEPS, categories=WATERFALL_STEPS, ordered=True),
                 "Value": [ev, -float(net_debt), eq],
             }
         )
-
-        fig3, ax3 = plt.subplots()
-        ax3.bar(wf["Step"], wf["Value"])
-        ax3.axhline(0, linewidth=1)
-        ax3.set_ylabel("m€")
-        ax3.set_title("Bridge: EV → Equity")
-        st.pyplot(fig3)
+        st.bar_chart(wf, x="Step", y="Value", x_label="", y_label="m€")
 
         st.subheader("Sensitivity (Equity Value)")
         show_sensi = st.checkbox("Show WACC × g sensitivity table", value=True)
 
         if show_sensi:
-            # Sensitivity grid (simple + credible)
-            wacc_grid = np.array([wacc - 0.01, wacc - 0.005, wacc, wacc + 0.005, wacc + 0.01])
-            g_grid = np.array([terminal_g - 0.005, terminal_g, terminal_g + 0.005])
-
-            # Guardrails (avoid invalid WACC <= g)
-            def equity_value_for(w, g):
-                if w <= g:
-                    return np.nan
-                pv_fcfs_local = float(sum(discount(fcfs, w)))
-                tv_local = float(terminal_value(fcfs[-1], w, g))
-                pv_tv_local = float(tv_local / (1 + w) ** len(fcfs))
-                ev_local = pv_fcfs_local + pv_tv_local
-                return ev_local - float(net_debt)
-
-            sensi = pd.DataFrame(
-                index=[f"{gg:.2%}" for gg in g_grid],
-                columns=[f"{ww:.2%}" for ww in wacc_grid],
-                data=[[equity_value_for(ww, gg) for ww in wacc_grid] for gg in g_grid],
-            )
+            # Sensitivity grid (simple + credible); invalid WACC <= g cells are NaN
+            sensi = compute_sensitivity(fcfs, wacc, terminal_g, float(net_debt))
 
             st.caption("Rows: terminal growth (g). Columns: WACC. Values: Equity Value (m€).")
-            st.dataframe(sensi.round(0), width="stretch")
+            st.dataframe(sensi.style.format("{:,.0f}", na_rep=""), width="stretch")
 
     except Exception as e:
         st.error(str(e))
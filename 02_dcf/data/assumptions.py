@@ -1,4 +1,5 @@
 # 02_dcf/data/assumptions.py
+from typing import NamedTuple
 
 # Horizon
 N_YEARS = 5
@@ -36,4 +37,46 @@ WEIGHT_DEBT = 0.30
 # =========================
 
 TERMINAL_GROWTH = 0.025   # 2.5%
-NET_DEBT = 600.0         # m€
\ No newline at end of file
+NET_DEBT = 600.0         # m€
+
+# =========================
+# Typed bundle (built once at import)
+# =========================
+
+class Assumptions(NamedTuple):
+    n_years: int
+    revenue_0: float
+    revenue_growth: float
+    ebit_margin: float
+    tax_rate: float
+    da_pct_revenue: float
+    capex_pct_revenue: float
+    nwc_pct_revenue: float
+    risk_free_rate: float
+    equity_risk_premium: float
+    beta: float
+    cost_of_debt: float
+    weight_equity: float
+    weight_debt: float
+    terminal_growth: float
+    net_debt: float
+
+
+ASSUMPTIONS = Assumptions(
+    n_years=int(N_YEARS),
+    revenue_0=float(REVENUE_0),
+    revenue_growth=float(REVENUE_GROWTH),
+    ebit_margin=float(EBIT_MARGIN),
+    tax_rate=float(TAX_RATE),
+    da_pct_revenue=float(DA_PCT_REVENUE),
+    capex_pct_revenue=float(CAPEX_PCT_REVENUE),
+    nwc_pct_revenue=float(NWC_PCT_REVENUE),
+    risk_free_rate=float(RISK_FREE_RATE),
+    equity_risk_premium=float(EQUITY_RISK_PREMIUM),
+    beta=float(BETA),
+    cost_of_debt=float(COST_OF_DEBT),
+    weight_equity=float(WEIGHT_EQUITY),
+    weight_debt=float(WEIGHT_DEBT),
+    terminal_growth=float(TERMINAL_GROWTH),
+    net_debt=float(NET_DEBT),
+)
@@ -0,0 +1,107 @@
+# 02_dcf/src/dcf_kernel.py
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(ROOT))
+
+from data.assumptions import ASSUMPTIONS
+
+try:
+    from numba import njit, vectorize
+except ImportError:  # numba is optional: the same loop runs as plain Python
+    njit = None
+
+
+# ======================================================
+# Scalar DCF kernel (FCF build-up + discounting in one loop)
+# ======================================================
+def _dcf_kernel(
+    revenue_0: float,
+    g: float,
+    margin: float,
+    tax: float,
+    da: float,
+    capex: float,
+    nwc_pct: float,
+    wacc: float,
+    term_g: float,
+    net_debt: float,
+    n: int,
+) -> tuple[float, float, float, float]:
+    """
+    (PV explicit FCFs, PV terminal value, EV, Equity) for one scenario.
+    Requires WACC > terminal growth; otherwise all four are NaN (the compiled
+    kernel cannot raise like terminal_value() does).
+    Scalar accumulators only: revenue, NWC and the discount factor are carried
+    multiplicatively across years (no arrays, no pow).
+    """
+    if wacc <= term_g:
+        return np.nan, np.nan, np.nan, np.nan
+
+    factor = 1.0 / (1.0 + wacc)
+    rev = revenue_0
+    prev_nwc = revenue_0 * nwc_pct
+    disc = 1.0
+    pv = 0.0
+    fcf = 0.0
+    for _ in range(n):
+        rev *= 1.0 + g
+        nwc = rev * nwc_pct
+        fcf = rev * margin * (1.0 - tax) + rev * da - rev * capex - (nwc - prev_nwc)
+        prev_nwc = nwc
+        disc *= factor
+        pv += fcf * disc
+
+    pv_tv = fcf * (1.0 + term_g) / (wacc - term_g) * disc
+    ev = pv + pv_tv
+    return pv, pv_tv, ev, ev - net_debt
+
+
+def _dcf_equity(revenue_0, g, margin, tax, da, capex, nwc_pct, wacc, term_g, net_debt, n):
+    """Equity value of one scenario (NaN when WACC <= terminal growth)."""
+    return dcf_kernel(revenue_0, g, margin, tax, da, capex, nwc_pct, wacc, term_g, net_debt, n)[3]
+
+
+if njit is not None:
+    dcf_kernel = njit(cache=True)(_dcf_kernel)
+
+    # Broadcasting ufunc over scenario arrays, evaluated in parallel
+    dcf_equity = vectorize(
+        ["float64(float64, float64, float64, float64, float64, float64, float64, "
+         "float64, float64, float64, int64)"],
+        target="parallel",
+    )(_dcf_equity)
+else:
+    dcf_kernel = _dcf_kernel
+    dcf_equity = np.vectorize(_dcf_equity, otypes=[np.float64])
+
+
+# ======================================================
+# Main: WACC x g scenario sweep on the default assumptions
+# ======================================================
+def main() -> np.ndarray:
+    wacc_grid = np.linspace(0.05, 0.10, 11)
+    g_grid = np.linspace(0.0, 0.04, 9)
+
+    a = ASSUMPTIONS
+    equity = dcf_equity(
+        a.revenue_0, a.revenue_growth, a.ebit_margin, a.tax_rate,
+        a.da_pct_revenue, a.capex_pct_revenue, a.nwc_pct_revenue,
+        wacc_grid[None, :], g_grid[:, None], a.net_debt, a.n_years,
+    )
+
+    print("=== Equity Value Sweep (rows: g, columns: WACC), m€ ===")
+    print("g \\ WACC " + "".join(f"{w:>10.2%}" for w in wacc_grid))
+    for g, row in zip(g_grid, equity):
+        print(f"{g:>8.2%} " + "".join(f"{v:>10,.0f}" for v in row))
+
+    print(f"\nTerminal growth (base case): {a.terminal_growth:.2%}")
+    return equity
+
+
+if __name__ == "__main__":
+    main()
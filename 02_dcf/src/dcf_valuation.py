@@ -2,7 +2,9 @@
 from __future__ import annotations
 
 import sys
+from functools import lru_cache
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
 # ======================================================
@@ -13,17 +15,42 @@ ROOT = SRC_DIR.parent                          # .../02_dcf
 sys.path.append(str(SRC_DIR))                  # allows import fcf_model, wacc
 sys.path.append(str(ROOT))                     # allows import data.assumptions
 
-from fcf_build import build_fcf_table
+from fcf_build import build_fcf_arrays
 from wacc import compute_wacc
-from data.assumptions import TERMINAL_GROWTH, NET_DEBT
+from data.assumptions import ASSUMPTIONS
+
+METRICS = (
+    "PV of explicit FCFs",
+    "PV of terminal value",
+    "Enterprise Value",
+    "Net Debt",
+    "Equity Value",
+)
 
 
 # ======================================================
 # Core DCF helpers
 # ======================================================
-def discount(values: list[float], rate: float) -> list[float]:
-    """Discount cash flows occurring at t=1..N."""
-    return [v / (1 + rate) ** t for t, v in enumerate(values, start=1)]
+@lru_cache(maxsize=128)
+def _discount_factors(n: int, rate: float) -> np.ndarray:
+    factors = np.cumprod(np.full(n, 1.0 / (1.0 + rate)))
+    factors.flags.writeable = False  # shared across callers via the cache
+    return factors
+
+
+def discount_factors(n: int, rate: float) -> np.ndarray:
+    """Discount factors 1 / (1 + rate) ** t for t=1..N (cumulative product, cached per N/rate)."""
+    return _discount_factors(int(n), round(float(rate), 10))
+
+
+def pv_of(values, rate: float) -> tuple[float, float]:
+    """
+    Present value of cash flows occurring at t=1..N (single dot product),
+    plus the t=N discount factor for discounting the terminal value.
+    """
+    v = np.asarray(values, dtype=np.float64)
+    factors = discount_factors(v.size, rate)
+    return float(np.dot(v, factors)), float(factors[-1])
 
 
 def terminal_value(fcf_last: float, wacc: float, g: float) -> float:
@@ -40,25 +67,29 @@ def write_dcf_report(valuation_df: pd.DataFrame, wacc: float) -> None:
     report_path = ROOT / "reports" / "dcf_summary.txt"
     report_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(report_path, "w", encoding="utf-8") as f:
-        f.write("DISCOUNTED CASH FLOW – SUMMARY\n")
-        f.write("=" * 40 + "\n\n")
-
-        f.write("1. Valuation Overview\n")
-        for _, row in valuation_df.iterrows():
-            f.write(f"{row['Metric']}: {row['Value (m€)']:,.0f} m€\n")
-
-        f.write("\n2. Key Assumptions\n")
-        f.write(f"WACC: {wacc:.2%}\n")
-        f.write(f"Terminal growth: {TERMINAL_GROWTH:.2%}\n")
-        f.write(f"Net debt: {NET_DEBT:,.0f} m€\n")
-
-        f.write("\n3. Conclusion\n")
-        f.write(
-            "The DCF valuation implies a robust enterprise and equity value. "
-            "As expected for a 5-year explicit forecast, a significant portion "
-            "of value is driven by terminal assumptions.\n"
-        )
+    metrics = valuation_df["Metric"].to_numpy()
+    values = valuation_df["Value (m€)"].to_numpy(dtype=np.float64)
+    lines = [
+        "DISCOUNTED CASH FLOW – SUMMARY",
+        "=" * 40,
+        "",
+        "1. Valuation Overview",
+        *(f"{m}: {v:,.0f} m€" for m, v in zip(metrics, values)),
+        "",
+        "2. Key Assumptions",
+        f"WACC: {wacc:.2%}",
+        f"Terminal growth: {ASSUMPTIONS.terminal_growth:.2%}",
+        f"Net debt: {ASSUMPTIONS.net_debt:,.0f} m€",
+        "",
+        "3. Conclusion",
+        "The DCF valuation implies a robust enterprise and equity value. "
+        "As expected for a 5-year explicit forecast, a significant portion "
+        "of value is driven by terminal assumptions.",
+        "",
+    ]
+
+    # Single formatting pass + single write
+    report_path.write_text("\n".join(lines), encoding="utf-8")
 
     print(f"\nDCF report written to: {report_path}")
 
@@ -68,47 +99,29 @@ def write_dcf_report(valuation_df: pd.DataFrame, wacc: float) -> None:
 # ======================================================
 def main() -> pd.DataFrame:
     # Build explicit FCFs
-    fcf_df = build_fcf_table()
-    fcfs = fcf_df["FCF"].astype(float).tolist()
+    a = ASSUMPTIONS
+    fcfs = build_fcf_arrays(a)["FCF"]
 
     # Discount rate
-    wacc = float(compute_wacc())
+    wacc = compute_wacc(a)
 
     # PV of explicit FCFs
-    discounted_fcfs = discount(fcfs, wacc)
-    pv_explicit = float(sum(discounted_fcfs))
+    pv_explicit, last_df = pv_of(fcfs, wacc)
 
     # Terminal value
-    tv = float(terminal_value(fcfs[-1], wacc, float(TERMINAL_GROWTH)))
-    pv_tv = float(tv / (1 + wacc) ** len(fcfs))
+    pv_tv = terminal_value(fcfs[-1], wacc, a.terminal_growth) * last_df
 
     # EV -> Equity bridge
     enterprise_value = pv_explicit + pv_tv
-    equity_value = enterprise_value - float(NET_DEBT)
-
-    valuation = pd.DataFrame(
-        {
-            "Metric": [
-                "PV of explicit FCFs",
-                "PV of terminal value",
-                "Enterprise Value",
-                "Net Debt",
-                "Equity Value",
-            ],
-            "Value (m€)": [
-                pv_explicit,
-                pv_tv,
-                enterprise_value,
-                float(NET_DEBT),
-                equity_value,
-            ],
-        }
-    )
+    equity_value = enterprise_value - a.net_debt
+
+    values = np.array([pv_explicit, pv_tv, enterprise_value, a.net_debt, equity_value], dtype=np.float64)
+    valuation = pd.DataFrame({"Metric": METRICS, "Value (m€)": values})
 
     print("\n=== DCF Valuation ===")
     print(valuation.round(1).to_string(index=False))
     print(f"\nWACC used: {wacc:.2%}")
-    print(f"Terminal growth: {TERMINAL_GROWTH:.2%}")
+    print(f"Terminal growth: {a.terminal_growth:.2%}")
 
     # Write report
     write_dcf_report(valuation, wacc)
@@ -4,73 +4,57 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT))
 
-from data.assumptions import (
-    N_YEARS,
-    REVENUE_0,
-    REVENUE_GROWTH,
-    EBIT_MARGIN,
-    TAX_RATE,
-    DA_PCT_REVENUE,
-    CAPEX_PCT_REVENUE,
-    NWC_PCT_REVENUE,
-)
-
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
-from data.assumptions import (
-    N_YEARS,
-    REVENUE_0,
-    REVENUE_GROWTH,
-    EBIT_MARGIN,
-    TAX_RATE,
-    DA_PCT_REVENUE,
-    CAPEX_PCT_REVENUE,
-    NWC_PCT_REVENUE,
-)
+from data.assumptions import Assumptions, ASSUMPTIONS
 
 ROOT = Path(__file__).resolve().parents[1]
 
 
-def build_fcf_table():
-    years = list(range(1, N_YEARS + 1))
+def build_fcf_arrays(a: Assumptions = ASSUMPTIONS) -> dict[str, np.ndarray]:
+    """FCF build-up as one ndarray per line item; the valuation only needs these."""
+    years = np.arange(1, a.n_years + 1)
 
     # Revenue projection
-    revenue = [REVENUE_0 * (1 + REVENUE_GROWTH) ** t for t in years]
+    revenue = a.revenue_0 * np.cumprod(np.full(a.n_years, 1.0 + a.revenue_growth))
 
     # Operating metrics
-    ebit = [r * EBIT_MARGIN for r in revenue]
-    nopat = [e * (1 - TAX_RATE) for e in ebit]
+    ebit = revenue * a.ebit_margin
+    nopat = ebit * (1.0 - a.tax_rate)
 
-    da = [r * DA_PCT_REVENUE for r in revenue]
-    capex = [r * CAPEX_PCT_REVENUE for r in revenue]
+    da = revenue * a.da_pct_revenue
+    capex = revenue * a.capex_pct_revenue
 
     # Working capital
-    nwc = [r * NWC_PCT_REVENUE for r in revenue]
-    delta_nwc = [nwc[0] - REVENUE_0 * NWC_PCT_REVENUE] + [
-        nwc[i] - nwc[i - 1] for i in range(1, N_YEARS)
-    ]
+    nwc = revenue * a.nwc_pct_revenue
+    delta_nwc = np.empty_like(nwc)
+    delta_nwc[0] = nwc[0] - a.revenue_0 * a.nwc_pct_revenue
+    delta_nwc[1:] = np.diff(nwc)
 
     # Free Cash Flow
-    fcf = [
-        nopat[i] + da[i] - capex[i] - delta_nwc[i]
-        for i in range(N_YEARS)
-    ]
-
-    df = pd.DataFrame(
-        {
-            "Year": years,
-            "Revenue": revenue,
-            "EBIT": ebit,
-            "NOPAT": nopat,
-            "D&A": da,
-            "CAPEX": capex,
-            "ΔNWC": delta_nwc,
-            "FCF": fcf,
-        }
-    )
+    fcf = nopat + da - capex - delta_nwc
 
-    return df
+    return {
+        "Year": years,
+        "Revenue": revenue,
+        "EBIT": ebit,
+        "NOPAT": nopat,
+        "D&A": da,
+        "CAPEX": capex,
+        "ΔNWC": delta_nwc,
+        "FCF": fcf,
+    }
+
+
+def arrays_to_df(arrays: dict[str, np.ndarray]) -> pd.DataFrame:
+    """DataFrame view of the FCF arrays, for printing and reports."""
+    return pd.DataFrame(arrays)
+
+
+def build_fcf_table(a: Assumptions = ASSUMPTIONS):
+    return arrays_to_df(build_fcf_arrays(a))
 
 
 def main():
@@ -4,29 +4,21 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(ROOT))
 
-from data.assumptions import (
-    RISK_FREE_RATE,
-    EQUITY_RISK_PREMIUM,
-    BETA,
-    COST_OF_DEBT,
-    TAX_RATE,
-    WEIGHT_EQUITY,
-    WEIGHT_DEBT,
-)
+from data.assumptions import Assumptions, ASSUMPTIONS
 
 
-def cost_of_equity():
-    return RISK_FREE_RATE + BETA * EQUITY_RISK_PREMIUM
+def cost_of_equity(a: Assumptions = ASSUMPTIONS):
+    return a.risk_free_rate + a.beta * a.equity_risk_premium
 
 
-def after_tax_cost_of_debt():
-    return COST_OF_DEBT * (1 - TAX_RATE)
+def after_tax_cost_of_debt(a: Assumptions = ASSUMPTIONS):
+    return a.cost_of_debt * (1 - a.tax_rate)
 
 
-def compute_wacc():
-    re = cost_of_equity()
-    rd = after_tax_cost_of_debt()
-    return WEIGHT_EQUITY * re + WEIGHT_DEBT * rd
+def compute_wacc(a: Assumptions = ASSUMPTIONS):
+    re = cost_of_equity(a)
+    rd = after_tax_cost_of_debt(a)
+    return a.weight_equity * re + a.weight_debt * rd
 
 
 if __name__ == "__main__":